@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+--------------------------------------------------------------------------------
+AUTHOR:      Nishar A Sunkesala / FixMyK8s
+PURPOSE:      Batch Linting: Manifest discovery & multi-core healing of many files.
+--------------------------------------------------------------------------------
+"""
+import os
+from typing import Tuple, Union, Optional, Set, List, Iterable, Iterator
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from kubecuro.healer import Healer, _thread_healer
+from kubecuro.cache import LintCache
+
+# --- DISCOVERY: YAML files under a tree, cheapest checks first ---
+_YAML_SUFFIXES = ('.yaml', '.yml')
+_MANIFEST_MARKERS = (b'apiVersion', b'kind:')
+
+def _looks_like_manifest(file_path: str, head_bytes: int) -> bool:
+    try:
+        with open(file_path, 'rb') as f: head = f.read(head_bytes)
+    except OSError:
+        return True  # let the healer report it
+    return any(m in head for m in _MANIFEST_MARKERS)
+
+def iter_k8s_yamls(root: str, sniff: bool = True, head_bytes: int = 512) -> Iterator[str]:
+    """
+    Yields the YAML files under root, one os.scandir() per directory (symlinked
+    directories are not followed). With sniff, files whose first head_bytes
+    mention neither apiVersion nor kind: (Helm values, CI configs) are skipped.
+    """
+    try:
+        with os.scandir(root) as it: entries = list(it)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+        elif entry.name.endswith(_YAML_SUFFIXES) and entry.is_file():
+            if not sniff or _looks_like_manifest(entry.path, head_bytes):
+                yield entry.path
+    for sub in subdirs:
+        yield from iter_k8s_yamls(sub, sniff, head_bytes)
+
+# --- BATCH LINTING: one Healer per worker process, files fanned out across cores ---
+_WORKER_HEALER: Optional[Healer] = None
+
+def _init_worker() -> None:
+    global _WORKER_HEALER
+    _WORKER_HEALER = Healer()
+
+def _lint_in_worker(opts: tuple, file_path: str) -> Tuple[str, Union[bool, Optional[str]], Set[str]]:
+    return (file_path, *_WORKER_HEALER.heal_file(file_path, *opts))
+
+def _lint_chunk_in_worker(opts: tuple, chunk: List[str]) -> List[Tuple[str, Union[bool, Optional[str]], Set[str]]]:
+    return [_lint_in_worker(opts, p) for p in chunk]
+
+def linter_engine_many(paths: Iterable[str], apply_api_fixes: bool = True, apply_defaults: bool = False, dry_run: bool = False, workers: Optional[int] = None, chunksize: int = 8) -> Iterator[Tuple[str, bool, Set[str]]]:
+    """Streams (path, changed, codes) as files finish, in completion order."""
+    paths = list(paths)
+    opts = (apply_api_fixes, apply_defaults, dry_run, False)
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+
+    if workers <= 1:
+        healer = _thread_healer()
+        for p in paths:
+            yield (p, *healer.heal_file(p, *opts))
+        return
+
+    # Chunked submits keep IPC per file low while results still stream back early
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_lint_chunk_in_worker, opts, paths[i:i + chunksize]) for i in range(0, len(paths), chunksize)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+def lint_files(paths: Iterable[str], apply_api_fixes: bool = True, apply_defaults: bool = False, dry_run: bool = False, return_content: bool = False, workers: Optional[int] = None, cache: Optional[LintCache] = None) -> List[Tuple[str, Union[bool, Optional[str]], Set[str]]]:
+    """Heals many files at once; returns (path, result, codes) in input order."""
+    paths = list(paths)
+    opts = (apply_api_fixes, apply_defaults, dry_run, return_content)
+
+    # Content requests always need the pipeline; everything else may hit the cache.
+    # Clean results hold either way, findings only replay when nothing gets written.
+    flags = f"{int(apply_api_fixes)}{int(apply_defaults)}"
+    use_cache = cache is not None and not return_content
+    results = {}
+    for p in (paths if use_cache else ()):
+        hit = cache.get(p, flags)
+        if hit and (dry_run or hit == (False, set())):
+            results[p] = (p, *hit)
+    todo = [p for p in paths if p not in results]
+
+    if todo:
+        workers = min(workers or os.cpu_count() or 1, len(todo))
+        # A single worker isn't worth a process spawn
+        if workers == 1:
+            healer = _thread_healer()
+            fresh = [(p, *healer.heal_file(p, *opts)) for p in todo]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                chunksize = max(1, len(todo) // (workers * 4))
+                fresh = list(pool.map(partial(_lint_in_worker, opts), todo, chunksize=chunksize))
+        for res in fresh:
+            results[res[0]] = res
+            if use_cache and (dry_run or (res[1] is False and not res[2])):
+                cache.put(res[0], flags, res[1], res[2])
+
+    if use_cache: cache.save()
+    return [results[p] for p in paths]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+--------------------------------------------------------------------------------
+AUTHOR:      Nishar A Sunkesala / FixMyK8s
+PURPOSE:      The Lint Cache: Replays healing results for files unchanged on disk.
+--------------------------------------------------------------------------------
+"""
+import sys
+import os
+import json
+import logging
+from typing import Tuple, Optional, Set
+import ruamel.yaml
+from kubecuro import healer, shield, loaders
+from kubecuro.healer import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# --- LINT CACHE: results are replayed while a file's (mtime, size) hold ---
+# Workspace-root file for library callers who opt in via lint_files(cache=...)
+CACHE_FILE = ".kubecuro-cache.json"
+
+def user_cache_file() -> str:
+    """Per-user cache the CLI shares across workspaces: $XDG_CACHE_HOME/kubecuro, else ~/.cache/kubecuro."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "kubecuro", "lint-cache.json")
+
+def _engine_key() -> str:
+    """
+    Cache key for the rule set: the package version and the YAML parser in use
+    (ruamel.yaml release, libyaml or pure Python), plus the rule modules' mtimes
+    when run from source.
+    """
+    try:
+        from kubecuro import __version__ as key
+    except ImportError:
+        key = "dev"
+    # Syntax verdicts and line marks come from the parser, so a ruamel upgrade or
+    # installing/removing ruamel.yaml.clib invalidates every entry too
+    key += f":ruamel-{ruamel.yaml.__version__}:{'clib' if loaders.CParser is not None else 'pure'}"
+    # A frozen (PyInstaller onefile) build unpacks fresh on every run, so its mtimes never repeat
+    if not getattr(sys, "frozen", False):
+        try:
+            key += ":" + ":".join(str(os.stat(m).st_mtime_ns) for m in (healer.__file__, shield.__file__, loaders.__file__))
+        except (OSError, TypeError):
+            pass
+    return key
+
+class LintCache:
+    """On-disk memo of healing results, keyed by absolute path and healing flags."""
+
+    def __init__(self, cache_file: str = CACHE_FILE):
+        self.cache_file = cache_file
+        # A new release or, in a source checkout, an edit to the rules invalidates every entry
+        self.engine = _engine_key()
+        self.entries = {}
+        self._modified = False
+        try:
+            with open(cache_file) as f:
+                data = json.load(f)
+            if data.get("engine") == self.engine:
+                self.entries = data.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    @staticmethod
+    def _key(file_path: str, flags: str) -> str:
+        return f"{os.path.abspath(file_path)}|{flags}"
+
+    def get(self, file_path: str, flags: str) -> Optional[Tuple[bool, Set[str]]]:
+        """(changed, codes) recorded for the file as it is on disk now, else None."""
+        entry = self.entries.get(self._key(file_path, flags))
+        if not entry: return None
+        try: st = os.stat(file_path)
+        except OSError: return None
+        if entry[:2] != [st.st_mtime_ns, st.st_size]: return None
+        return bool(entry[2]), set(entry[3])
+
+    def put(self, file_path: str, flags: str, changed: bool, codes: Set[str]) -> None:
+        try: st = os.stat(file_path)
+        except OSError: return
+        self.entries[self._key(file_path, flags)] = [st.st_mtime_ns, st.st_size, bool(changed), sorted(codes)]
+        self._modified = True
+
+    def is_clean(self, file_path: str, flags: str) -> bool:
+        return self.get(file_path, flags) == (False, set())
+
+    def mark_clean(self, file_path: str, flags: str) -> None:
+        self.put(file_path, flags, False, set())
+
+    def save(self) -> None:
+        if not self._modified: return
+        try:
+            cache_dir = os.path.dirname(self.cache_file)
+            if cache_dir: os.makedirs(cache_dir, exist_ok=True)
+            # Atomic, so an interrupted or overlapping run never leaves a truncated cache
+            write_atomic(self.cache_file, json.dumps({"engine": self.engine, "files": self.entries}))
+            self._modified = False
+        except OSError as e:
+            logger.debug(f"Lint cache not saved: {e}")
@@ -8,59 +8,214 @@ PURPOSE:      The Healer Engine: Syntax Repair, API Migration, & Security Patchi
 import sys
 import re
 import os
+import shutil
+import tempfile
 import logging
-from typing import Tuple, Union, Optional, Set
+import threading
+from typing import Tuple, Union, Optional, Set, List, Iterator
 from io import StringIO
+from types import MappingProxyType
+from functools import lru_cache
 from ruamel.yaml import YAML
+from ruamel.yaml.error import YAMLError
+from ruamel.yaml.events import ScalarEvent, MappingStartEvent, MappingEndEvent, SequenceEndEvent, DocumentStartEvent
 from kubecuro.shield import Shield, RegexShield
+from kubecuro.loaders import marked_yaml, in_marked_subset
 
 logger = logging.getLogger(__name__)
 
+# --- Precompiled patterns (hot loops reuse these instead of re-parsing) ---
+_MEM_RE = re.compile(r'(\d+)([a-z]*)')
+# MiB per memory suffix, built once rather than per parse
+_MEM_UNITS = {'k': 1/1024, 'm': 1, 'g': 1024, 't': 1024*1024,
+              'ki': 1/1024, 'mi': 1, 'gi': 1024, 'ti': 1024*1024}
+_K8S_KEYS = r"(image|name|containerPort|hostPort|protocol|imagePullPolicy|kind|apiVersion|labels)"
+_MISSING_COLON_RE = re.compile(rf'^[ \t]*{_K8S_KEYS}[ \t]+[\'"\[\w]')
+_COLON_INJECT_RE = re.compile(rf'^([ \t]*)({_K8S_KEYS})([ \t]+)')
+# Container profiles for default limits: one scan per container instead of a needle loop
+_DUMMY_EXEC_RE = re.compile(r'sleep |tail -f /dev/null|pause|infinity')
+_SIDECAR_IMAGE_RE = re.compile(r'istio-proxy|envoy|fluentd|sidecar|otel-collector')
+
+def _separator_spans(text: str) -> Iterator[Tuple[int, int]]:
+    r"""
+    Spans of the r'(?m)^---\s*$' document separators, found with str.find: a
+    regex tries '^' at every line start, the literal search jumps to candidates.
+    """
+    n = len(text)
+    cand = 0 if text.startswith('---') else text.find('\n---') + 1 or -1
+    while cand >= 0:
+        # '\s*$' takes the whole whitespace run, backing off to its last newline
+        q = cand + 3
+        while q < n and text[q].isspace(): q += 1
+        end = n if q == n else text.rfind('\n', cand + 3, q)
+        if end >= 0:
+            yield cand, end
+        nxt = text.find('\n---', end if end >= 0 else cand)
+        cand = nxt + 1 if nxt >= 0 else -1
+
+def _split_docs(text: str) -> Tuple[List[str], List[int]]:
+    """Documents between '---' separators, with the 1-based line each one starts on."""
+    docs, starts, pos, line = [], [], 0, 1
+    for start, end in _separator_spans(text):
+        docs.append(text[pos:start])
+        starts.append(line)
+        # A document starts on the line after its separator, whose newline (and any
+        # blank lines '\s*' swallowed) stays out of the slice
+        line += text.count('\n', pos, end) + 1
+        pos = end + 1
+    docs.append(text[pos:])
+    starts.append(line)
+    return docs, starts
+
+def _read_text(file_path: str) -> str:
+    """
+    Whole-file read as text mode would return it (strict UTF-8, universal
+    newlines), but as one unbuffered read and one decode.
+    """
+    with open(file_path, 'rb', buffering=0) as f: text = f.read().decode('utf-8')
+    if '\r' in text: text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def write_atomic(file_path: str, content: str) -> None:
+    """Write-to-temp then rename, so the file is never left half-written."""
+    target = os.path.realpath(file_path)
+    # Unique name in the target's directory: concurrent writers never share a temp file,
+    # and os.replace stays a same-filesystem rename
+    f = tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=os.path.dirname(target),
+                                    prefix=f".{os.path.basename(target)}.", suffix=".tmp", delete=False)
+    tmp_path = f.name
+    try:
+        with f: f.write(content)
+        # A file written for the first time keeps the temp file's private mode
+        if os.path.exists(target): shutil.copymode(target, tmp_path)
+        os.replace(tmp_path, target)
+    finally:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+
+def _value_offset(text: str, node, key: str, value: str) -> int:
+    """Offset of node[key]'s scalar in text, located from the parser's line/col marks.
+
+    Returns -1 when the marks do not lead back to `value` verbatim (odd line breaks,
+    aliases, folded scalars); callers then fall back to a dump.
+    """
+    try:
+        line, col = node.lc.value(key)
+    except (AttributeError, KeyError, TypeError):
+        return -1
+    start = 0
+    for _ in range(line):
+        start = text.find('\n', start) + 1
+        if not start: return -1
+    pos = start + col
+    if text[pos:pos + 1] in ('"', "'"): pos += 1
+    return pos if text.startswith(value, pos) else -1
+
+# Quantities repeat across containers ("100m", "256Mi"): keyed on the str form,
+# so YAML nodes of any type hit the same entry
+@lru_cache(maxsize=512)
+def _cpu_millicores(cpu_str: str) -> int:
+    cpu_str = cpu_str.strip()
+    if cpu_str.endswith('m'):
+        return int(cpu_str[:-1])
+    try:
+        return int(float(cpu_str) * 1000)
+    except ValueError:
+        return 0
+
+@lru_cache(maxsize=512)
+def _mem_mib(mem_str: str) -> int:
+    mem_str = mem_str.strip().lower()
+    match = _MEM_RE.match(mem_str)
+    if not match: return 0
+    val, unit = match.groups()
+    return int(int(val) * _MEM_UNITS.get(unit, 1))
+
+# Shield keeps no per-scan state, so every Healer shares one instance
+_SHIELD = Shield()
+_UPGRADES = Shield.UPGRADES
+
+def _rt_yaml() -> YAML:
+    """
+    Round-trip loader: preserves comments and block styles. YAML objects keep
+    parse state between calls and are not thread-safe, so every Healer builds
+    its own (one per thread via linter_engine, one per batch worker process).
+    """
+    rt = YAML(typ='rt')
+    # Kubernetes Standard: 2 space mapping, 2 space sequence, 0 offset
+    rt.indent(mapping=2, sequence=4, offset=2)
+    rt.preserve_quotes = True
+    rt.width = 4096
+    return rt
+
+
+# Top-level 'kind:' header, read without a YAML parse
+_KIND_RE = re.compile(r'^kind:[ \t]*["\']?([A-Za-z0-9]+)', re.MULTILINE)
+# Kinds that carry a pod template (security/resource patching applies)
+_WORKLOAD_KINDS = Shield.WORKLOAD_KINDS
+# Read-only default for optional sub-mappings: a miss allocates nothing, and a
+# stray write into it raises instead of leaking into later documents
+_NO_ENTRIES = MappingProxyType({})
+# Kinds whose healing/scan reads the PASS 1 metadata map
+_CROSS_REF_KINDS = frozenset({'Service', 'HorizontalPodAutoscaler', 'Ingress'})
+# Kinds PASS 1 takes selector labels from (Service healing's only input)
+_LABEL_SOURCE_KINDS = frozenset({'Pod', 'Deployment', 'StatefulSet', 'DaemonSet'})
+
+# Documents whose healed outcome a Healer remembers (oldest dropped first)
+_DOC_MEMO_SIZE = 256
+# Kinds some Shield rule or fix acts on; any other doc can only be flagged by
+# validate_schema or the parse itself (see Healer.inert_header)
+_SCANNED_KINDS = _WORKLOAD_KINDS | _CROSS_REF_KINDS | {'Role', 'ClusterRole'}
+# Plain scalars that may resolve to something other than a str (so keys could collide)
+_NON_STR_PLAIN_RE = re.compile(r'[-+.\d=~<]|(?i:null|true|false|yes|no|on|off|y|n)$|$')
+# Plain scalars the round-trip constructor may reject (numbers, timestamps, '=')
+_TYPED_PLAIN_RE = re.compile(r'[-+.\d=]')
+# Failures that fall back to the document's raw text: YAML errors from load/dump,
+# odd node shapes tripping the patchers, and non-finite quantities ('cpu: inf').
+# Anything else is a bug and propagates.
+_DOC_ERRORS = (YAMLError, AttributeError, KeyError, TypeError, ValueError, OverflowError, RecursionError)
+
 class Healer:
     def __init__(self):
-        # Round-trip loader preserves comments and block styles
-        self.yaml = YAML(typ='rt')
-        # Kubernetes Standard: 2 space mapping, 2 space sequence, 0 offset
-        self.yaml.indent(mapping=2, sequence=4, offset=2)
-        self.yaml.preserve_quotes = True
-        self.yaml.width = 4096
-        
+        # Loaders are per instance: a ruamel YAML object is not safe to share across threads
+        self.yaml = _rt_yaml()
+        # Safe loader for passes that only read metadata and never dump: ruamel binds
+        # it to the libyaml C parser when ruamel.yaml.clib is installed
+        self.fast_yaml = YAML(typ='safe')
+        # Detection-only C-parser twin of self.yaml (see load_marked); None without clib
+        self.marked_yaml = marked_yaml()
+        # Scratch buffer for per-document dumps, rewound instead of reallocated
+        self._dump_buf = StringIO()
+
         # --- SHIELD INTEGRATION ---
-        self.shield = Shield()
+        self.shield = _SHIELD
         self.detected_codes: Set[str] = set()
+        # Raw (code, line) detections; formatted to "CODE:line" once per heal
+        self._found: Set[Tuple[str, int]] = set()
+        # Set by every structural edit; an edited file is changed by definition
+        self._dirty = False
+        # Healed outcome of recently seen documents (see heal_file PASS 2)
+        self._doc_memo: dict = {}
 
     def parse_cpu(self, cpu_str: str) -> int:
         """Convert K8s CPU string to millicores."""
         if not cpu_str: return 0
-        cpu_str = str(cpu_str).strip()
-        if cpu_str.endswith('m'):
-            return int(cpu_str[:-1])
-        try:
-            return int(float(cpu_str) * 1000)
-        except ValueError:
-            return 0
+        return _cpu_millicores(str(cpu_str))
 
     def parse_mem(self, mem_str: str) -> int:
         """Convert K8s Memory string to MiB."""
         if not mem_str: return 0
-        mem_str = str(mem_str).strip().lower()
-        units = {'k': 1/1024, 'm': 1, 'g': 1024, 't': 1024*1024,
-                 'ki': 1/1024, 'mi': 1, 'gi': 1024, 'ti': 1024*1024}
-        match = re.match(r'(\d+)([a-z]*)', mem_str)
-        if not match: return 0
-        val, unit = match.groups()
-        return int(int(val) * units.get(unit, 1))
+        return _mem_mib(str(mem_str))
 
     def get_line(self, obj: any, key: Optional[str] = None) -> int:
         """Extract line number from ruamel.yaml LC data."""
+        # EAFP: ruamel nodes always carry lc, so the success path pays no probes
         try:
-            if obj is None: return 1
-            if key and hasattr(obj, 'lc') and hasattr(obj.lc, 'data') and key in obj.lc.data:
-                return obj.lc.data[key][0] + 1
-            if hasattr(obj, 'lc') and hasattr(obj.lc, 'line'):
-                return obj.lc.line + 1
-            return 1
-        except Exception:
+            lc = obj.lc
+            if key:
+                try: return lc.data[key][0] + 1
+                except KeyError: pass  # fall back to the node's own line
+            return lc.line + 1
+        except (AttributeError, TypeError, IndexError):
             return 1
 
     def validate_schema(self, doc: dict, kind: str) -> bool:
@@ -86,105 +241,236 @@ class Healer:
             return any(field in doc for field in fields)
         return True
 
+    def metadata_sources(self, raw_docs: list, shielded_docs: list) -> list:
+        """
+        Header peek: PASS 1 only feeds Service selector healing and the
+        Shield HPA/Ingress cross-checks. Any document without a readable
+        top-level kind keeps the full pass; otherwise a Service needs only
+        the workloads its selector could be taken from.
+        """
+        sources, kinds = [], []
+        for doc_str, shielded in zip(raw_docs, shielded_docs):
+            if shielded is None: continue
+            match = _KIND_RE.search(doc_str)
+            if not match: return [s[0] for s in shielded_docs if s is not None]
+            kind = match.group(1)
+            if kind in _CROSS_REF_KINDS and kind != 'Service': return [s[0] for s in shielded_docs if s is not None]
+            sources.append(shielded[0])
+            kinds.append(kind)
+        if 'Service' not in kinds: return []
+        return [src for src, kind in zip(sources, kinds) if kind in _LABEL_SOURCE_KINDS]
+
+    def load_metadata_docs(self, sources: list) -> list:
+        """Parses PASS 1 docs in one load_all stream; per-doc only if the stream breaks."""
+        if not sources: return []
+        try:
+            docs = list(self.fast_yaml.load_all("\n---\n".join(sources)))
+            # A stray '...' marker can shift boundaries; only trust a 1:1 stream
+            if len(docs) == len(sources): return docs
+        except Exception:
+            pass
+        docs = []
+        for src in sources:
+            try: docs.append(self.fast_yaml.load(src))
+            except Exception: docs.append(None)
+        return docs
+
     def apply_security_patches(self, doc: dict, kind: str, global_line_offset: int = 0, apply_defaults: bool = False) -> None:
         """Standard Security Hardening & Stability Patching."""
-        if not isinstance(doc, dict): return
+        # EAFP: parsed YAML values without .get() are never mappings
+        try: spec = doc.get('spec', _NO_ENTRIES)
+        except AttributeError: return
 
         # 1. Service Logic
         if kind == 'Service':
-            spec = doc.get('spec', {})
             if not spec or not spec.get('selector'):
                 actual_line = global_line_offset + (self.get_line(doc, 'spec') - 1)
                 if not apply_defaults:
-                    self.detected_codes.add(f"SVC_SELECTOR_MISSING:{actual_line}")
+                    self._found.add(("SVC_SELECTOR_MISSING", actual_line))
             return
         
         # 2. Workload Navigation
-        workloads = ['Deployment', 'Pod', 'StatefulSet', 'DaemonSet', 'Job', 'CronJob']
-        if kind not in workloads: return
-            
-        spec = doc.get('spec', {})
-        if not isinstance(spec, dict): return
+        if kind not in _WORKLOAD_KINDS: return
 
         if kind == 'CronJob':
-            job_tmpl_spec = spec.get('jobTemplate', {}).get('spec', {})
-            template = job_tmpl_spec.get('template', {})
-            t_spec = template.get('spec', {})
+            try: job_tmpl = spec.get('jobTemplate', _NO_ENTRIES)
+            except AttributeError: return
+            job_tmpl_spec = job_tmpl.get('spec', _NO_ENTRIES)
+            template = job_tmpl_spec.get('template', _NO_ENTRIES)
+            t_spec = template.get('spec', _NO_ENTRIES)
         elif kind == 'Pod':
             t_spec = spec
         else:
-            template = spec.get('template', {})
-            t_spec = template.get('spec', {})
+            try: template = spec.get('template', _NO_ENTRIES)
+            except AttributeError: return
+            t_spec = template.get('spec', _NO_ENTRIES)
         
-        if not t_spec or not isinstance(t_spec, dict): return
+        if not t_spec: return
 
         # 3. Security: Token Audit
-        if t_spec.get('automountServiceAccountToken') is None:
+        try: token = t_spec.get('automountServiceAccountToken')
+        except AttributeError: return
+        if token is None:
             token_line = global_line_offset + (self.get_line(t_spec) - 1)
-            self.detected_codes.add(f"SEC_TOKEN_AUDIT:{token_line}")
+            self._found.add(("SEC_TOKEN_AUDIT", token_line))
 
         # 4. Container-level fixes
         containers = t_spec.get('containers', [])
         if not isinstance(containers, list): return
 
+        # Bound once: the loop below runs for every init/sidecar container
+        found_add, get_line = self._found.add, self.get_line
         for idx, c in enumerate(containers):
-            c_image = str(c.get('image', '')).lower()
-            c_cmd = " ".join(c.get('command', [])) if isinstance(c.get('command'), list) else str(c.get('command', ''))
-            c_args = " ".join(c.get('args', [])) if isinstance(c.get('args'), list) else str(c.get('args', ''))
-            exec_context = (c_cmd + " " + c_args).lower()
-
-            is_dummy = any(sig in exec_context for sig in ['sleep ', 'tail -f /dev/null', 'pause', 'infinity'])
-            is_sidecar = any(sig in c_image for sig in ['istio-proxy', 'envoy', 'fluentd', 'sidecar', 'otel-collector'])
-            
-            if is_dummy: profile = {'cpu': '10m', 'memory': '32Mi'}
-            elif is_sidecar: profile = {'cpu': '100m', 'memory': '128Mi'}
-            elif idx > 0: profile = {'cpu': '200m', 'memory': '192Mi'}
-            else: profile = {'cpu': '500m', 'memory': '256Mi'}
+            # Joined up front: a non-string command/args item fails the document either way
+            cmd, args = c.get('command', ''), c.get('args', '')
+            c_cmd = " ".join(cmd) if isinstance(cmd, list) else str(cmd)
+            c_args = " ".join(args) if isinstance(args, list) else str(args)
 
             # 5. Resources & OOM Fixes
-            res = c.get('resources', {})
+            res = c.get('resources', _NO_ENTRIES)
             if 'limits' not in res:
-                actual_line = global_line_offset + (self.get_line(c) - 1)
+                actual_line = global_line_offset + (get_line(c) - 1)
                 if apply_defaults:
                     if 'resources' not in c: c['resources'] = {}
-                    reqs = res.get('requests', {})
-                    final_cpu, final_mem = profile['cpu'], profile['memory']
+                    reqs = res.get('requests', _NO_ENTRIES)
+                    # Container profile, classified only when limits are actually injected
+                    if _DUMMY_EXEC_RE.search(f"{c_cmd} {c_args}".lower()): final_cpu, final_mem = '10m', '32Mi'
+                    elif _SIDECAR_IMAGE_RE.search(str(c.get('image', '')).lower()): final_cpu, final_mem = '100m', '128Mi'
+                    elif idx > 0: final_cpu, final_mem = '200m', '192Mi'
+                    else: final_cpu, final_mem = '500m', '256Mi'
                     if 'cpu' in reqs and self.parse_cpu(reqs['cpu']) > self.parse_cpu(final_cpu):
                         final_cpu = reqs['cpu']
                     if 'memory' in reqs and self.parse_mem(reqs['memory']) > self.parse_mem(final_mem):
                         final_mem = reqs['memory']
                     c['resources']['limits'] = {'cpu': final_cpu, 'memory': final_mem}
-                    self.detected_codes.add(f"OOM_FIXED:{actual_line}")
+                    self._dirty = True
+                    found_add(("OOM_FIXED", actual_line))
                 else:
-                    self.detected_codes.add(f"OOM_RISK:{actual_line}")
+                    found_add(("OOM_RISK", actual_line))
 
             # 6. Privileged Context
-            s_ctx = c.get('securityContext', {})
-            if isinstance(s_ctx, dict) and s_ctx.get('privileged') is True:
-                actual_line = global_line_offset + (self.get_line(c, 'securityContext') - 1)
+            s_ctx = c.get('securityContext', _NO_ENTRIES)
+            try: privileged = s_ctx.get('privileged')
+            except AttributeError: privileged = None
+            if privileged is True:
+                actual_line = global_line_offset + (get_line(c, 'securityContext') - 1)
                 if apply_defaults:
                     s_ctx['privileged'] = False
-                    self.detected_codes.add(f"SEC_PRIVILEGED_FIXED:{actual_line}")
+                    self._dirty = True
+                    found_add(("SEC_PRIVILEGED_FIXED", actual_line))
                 else:
-                    self.detected_codes.add(f"SEC_PRIVILEGED_RISK:{actual_line}")
+                    found_add(("SEC_PRIVILEGED_RISK", actual_line))
+
+    def _emit_part(self, out: StringIO, part: str, first: bool) -> bool:
+        """Streams one healed document into `out`; ghost (blank) parts are dropped."""
+        if not part.strip(): return first
+        if not first: out.write("\n---\n")
+        # Clean trailing whitespace on every line to ensure stability
+        out.write("\n".join([l.rstrip() for l in part.splitlines()]))
+        return False
+
+    def load_marked(self, text: str):
+        """Detection-only parse via libyaml; the pure loader re-parses anything it rejects."""
+        # libyaml and ruamel's scanner disagree on tabs, non-ASCII input (BOMs, unicode
+        # line breaks) and misplaced anchor/tag/directive indicators; those documents
+        # keep the pure loader's verdict
+        if self.marked_yaml is None or not in_marked_subset(text):
+            return self.yaml.load(text)
+        try:
+            return self.marked_yaml.load(text)
+        except YAMLError:
+            # Let the round-trip loader give the authoritative verdict and error mark
+            return self.yaml.load(text)
 
-    def heal_file(self, file_path: str, apply_fixes: bool = True, apply_defaults: bool = False, dry_run: bool = False, return_content: bool = False) -> Tuple[Union[bool, Optional[str]], Set[str]]:
+    def inert_header(self, text: str) -> Optional[Tuple[object, Set[str]]]:
+        """
+        (kind, top-level keys) of a document no Shield rule or fix applies to, read
+        from libyaml's event stream without constructing it. None whenever the full
+        parse must decide instead: a kind or deprecated apiVersion the scan acts on,
+        text outside load_marked's C-parser subset, a syntax error, or any shape the
+        constructor or Shield could reject (duplicate or non-str keys, typed plain
+        scalars, non-mapping metadata/spec).
+        """
+        if self.marked_yaml is None or not in_marked_subset(text):
+            return None
+        m = _KIND_RE.search(text)
+        if m and m.group(1) in _SCANNED_KINDS: return None
+        head, keys, stack, key, docs = {}, None, [], None, 0
         try:
-            if not os.path.exists(file_path): return (None if return_content else False, set())
-            with open(file_path, 'r') as f: original_content = f.read()
-            
-            raw_docs = re.split(r'^---\s*$', original_content, flags=re.MULTILINE)
-            healed_parts = []
-            self.detected_codes = set()           
+            for ev in self.marked_yaml.parse(text):
+                t = type(ev)
+                if t is MappingEndEvent or t is SequenceEndEvent:
+                    stack.pop()
+                    continue
+                if t is DocumentStartEvent:
+                    docs += 1
+                    if docs > 1: return None
+                    continue
+                if not hasattr(ev, 'anchor'): continue  # stream/document end
+                plain = t is ScalarEvent and not ev.style
+                if not stack:
+                    # Document root: only mappings reach the scan
+                    if t is not MappingStartEvent: return None
+                    keys = set()
+                    stack.append([keys, True])
+                    continue
+                top = stack[-1]
+                if top[0] is not None and top[1]:
+                    # Mapping key: plain str-like scalars only, so duplicates are exact
+                    if t is not ScalarEvent or (plain and _NON_STR_PLAIN_RE.match(ev.value)): return None
+                    if ev.value in top[0]: return None
+                    top[0].add(ev.value)
+                    top[1] = False
+                    if len(stack) == 1: key = ev.value
+                    continue
+                if top[0] is not None: top[1] = True
+                if len(stack) == 1:
+                    if key in ('kind', 'apiVersion'):
+                        if t is not ScalarEvent or (plain and _NON_STR_PLAIN_RE.match(ev.value)): return None
+                        head[key] = ev.value
+                    elif key in ('metadata', 'spec') and t is not MappingStartEvent:
+                        return None
+                if t is ScalarEvent:
+                    if plain and _TYPED_PLAIN_RE.match(ev.value): return None
+                elif t is MappingStartEvent:
+                    stack.append([set(), True])
+                else:
+                    # Sequences; aliases never get here (see in_marked_subset)
+                    stack.append([None, False])
+        except YAMLError:
+            return None
+        if keys is None or head.get('kind') in _SCANNED_KINDS or head.get('apiVersion') in _UPGRADES:
+            return None
+        return head.get('kind'), keys
+
+    def heal_file(self, file_path: str, apply_fixes: bool = True, apply_defaults: bool = False, dry_run: bool = False, return_content: bool = False, codes_only: bool = False) -> Tuple[Union[bool, Optional[str]], Set[str]]:
+        try:
+            # EAFP: one open() instead of a stat() followed by open()
+            try:
+                original_content = _read_text(file_path)
+            except FileNotFoundError:
+                return (None if return_content else False, set())
+            self.detected_codes = set()
+            self._found = set()
+            self._dirty = False
+
+            # Pre-filter: a blank file heals to a single newline, skip split/sanitize/parse
+            if not original_content.strip():
+                if codes_only: return (None, self.detected_codes)
+                return ("\n" if return_content else False, self.detected_codes)
+
+            raw_docs, doc_starts = _split_docs(original_content)
+            # Sanitize each document once; both passes read the same result
+            shielded_docs = [RegexShield.sanitize(d) if d.strip() else None for d in raw_docs]
+            # Healed docs stream into one writer; `buf` is reused for every dump
+            out, buf, first = StringIO(), self._dump_buf, True
+            if original_content.startswith("---"): out.write("---\n")
 
             # --- PASS 1: METADATA MAP (Multi-Pass Mapping) ---
             all_parsed_docs = []
             label_map = {}
-            for doc_str in raw_docs:
-                if not doc_str.strip(): continue
-                clean_d, _ = RegexShield.sanitize(doc_str)
+            for temp_parsed in self.load_metadata_docs(self.metadata_sources(raw_docs, shielded_docs)):
                 try:
-                    temp_parsed = self.yaml.load(clean_d)
                     if temp_parsed and isinstance(temp_parsed, dict):
                         all_parsed_docs.append(temp_parsed)
                         kind, name = temp_parsed.get('kind'), temp_parsed.get('metadata', {}).get('name')
@@ -192,36 +478,50 @@ class Healer:
                             labels = None
                             if kind == 'Pod':
                                 labels = temp_parsed.get('metadata', {}).get('labels')
-                            elif kind in ['Deployment', 'StatefulSet', 'DaemonSet']:
+                            elif kind in _LABEL_SOURCE_KINDS:
                                 labels = temp_parsed.get('spec', {}).get('template', {}).get('metadata', {}).get('labels')
                             if labels: label_map[(kind, name)] = labels
                 except Exception: continue
 
             # --- PASS 2: HEALING LOOP ---
-            current_line_offset = 1
-            for doc_str in raw_docs:
-                if not doc_str.strip():
-                    current_line_offset += len(doc_str.splitlines()) + 1
+            # Bound once per file: no migrations are looked up unless fixes are on
+            upgrades = _UPGRADES if apply_fixes else {}
+            found, memo = self._found, self._doc_memo
+            for doc_str, shielded, current_line_offset in zip(raw_docs, shielded_docs, doc_starts):
+                if shielded is None: continue
+
+                # A byte-identical document heals the same way (codes relative to its
+                # start line) unless it reads the PASS 1 maps; templated bundles repeat
+                memo_key = (doc_str, apply_fixes, apply_defaults, codes_only)
+                hit = memo.get(memo_key)
+                if hit is not None:
+                    part, doc_codes, doc_dirty = hit
+                    found.update((code, current_line_offset + rel) for code, rel in doc_codes)
+                    self._dirty = self._dirty or doc_dirty
+                    if part is not None: first = self._emit_part(out, part, first)
                     continue
+                # This document's detections and edits are kept apart, then folded in below
+                self._found = set()
+                dirty_before, self._dirty = self._dirty, False
 
                 # 1. INITIAL REGEX SANITIZATION (Regex Shield)
-                d, shield_codes = RegexShield.sanitize(doc_str)
-                lines_in_doc = len(doc_str.splitlines())
+                d, shield_codes = shielded
                 for code in shield_codes:
-                    self.detected_codes.add(f"{code}:{current_line_offset}")
+                    self._found.add((code, current_line_offset))
 
                 # 2. ENHANCED PRE-PARSER (Indentation, Metadata, Colons)
-                lines = d.splitlines()
+                # One pass over the lines; every repair below is applied inline
                 repaired_lines = []
                 last_valid_indent = 0 # Track parent depth
+                found_add = self._found.add
                 
-                for idx, line in enumerate(lines):
+                for line_no, line in enumerate(d.splitlines(), current_line_offset):
                     clean_line = line.rstrip()
-                    if not clean_line.strip():
+                    stripped = clean_line.lstrip()
+                    if not stripped:
                         repaired_lines.append("")
                         continue
                 
-                    stripped = clean_line.lstrip()
                     indent = len(clean_line) - len(stripped)
                     is_parent = stripped.endswith(':')
                 
@@ -232,21 +532,18 @@ class Healer:
                             new_indent = last_valid_indent + 2
                             clean_line = (" " * new_indent) + stripped
                             indent = new_indent
-                            self.detected_codes.add(f"FIX_INDENTATION_SNAPPED:{current_line_offset + idx}")
+                            found_add(("FIX_INDENTATION_SNAPPED", line_no))
                 
                     # B. Metadata Alignment (Special case for 'name' in metadata)
-                    if "name:" in clean_line and clean_line.startswith("    "):
-                         # Keep this as a safety fallback for common K8s metadata bloat
-                         is_in_metadata = any("metadata:" in line for line in repaired_lines[-5:])
-                         if "name:" in clean_line and clean_line.startswith("    ") and is_in_metadata:
-                            clean_line = "  " + clean_line.lstrip()
-                            indent = 2
+                    # Keep this as a safety fallback for common K8s metadata bloat
+                    if "name:" in clean_line and clean_line.startswith("    ") and any("metadata:" in prev for prev in repaired_lines[-5:]):
+                        clean_line = "  " + clean_line.lstrip()
+                        indent = 2
                 
-                    # C. Smart Colon Injection
-                    k8s_keys = r"(image|name|containerPort|hostPort|protocol|imagePullPolicy|kind|apiVersion|labels)"
-                    if re.search(rf'^[ \t]*{k8s_keys}[ \t]+[\'"\[\w]', clean_line) and ":" not in clean_line:
-                        clean_line = re.sub(rf'^([ \t]*)({k8s_keys})([ \t]+)', r'\1\2: \3', clean_line)
-                        self.detected_codes.add(f"FIX_COLON_INJECTED:{current_line_offset + idx}")
+                    # C. Smart Colon Injection (substring test first: nearly every line has a colon)
+                    if ":" not in clean_line and _MISSING_COLON_RE.search(clean_line):
+                        clean_line = _COLON_INJECT_RE.sub(r'\1\2: \3', clean_line)
+                        found_add(("FIX_COLON_INJECTED", line_no))
                         
                     # D. Double-colon guard
                     if "image: image" in clean_line:
@@ -263,33 +560,42 @@ class Healer:
                 d = "\n".join(repaired_lines)
 
                 # 3. PARSING & STRUCTURAL HEALING
+                api_rewrite = kind = part = None
                 try:
-                    parsed = self.yaml.load(d)
-                    if parsed and isinstance(parsed, dict):
+                    # Nothing is dumped for codes_only, so comments need not survive the parse,
+                    # and docs no rule applies to need not be built at all
+                    header = self.inert_header(d) if codes_only else None
+                    parsed = None if header else self.load_marked(d) if codes_only else self.yaml.load(d)
+                    if header:
+                        kind = header[0]
+                        if not self.validate_schema(header[1], kind):
+                            self._found.add(("SCHEMA_INVALID_STRUCTURE", current_line_offset))
+                    elif parsed and isinstance(parsed, dict):
                         kind = parsed.get('kind')
                         api = parsed.get('apiVersion')
                         name = parsed.get('metadata', {}).get('name')
 
                         if not self.validate_schema(parsed, kind):
-                            self.detected_codes.add(f"SCHEMA_INVALID_STRUCTURE:{current_line_offset}")
+                            self._found.add(("SCHEMA_INVALID_STRUCTURE", current_line_offset))
 
                         findings = self.shield.scan(parsed, all_docs=all_parsed_docs)
                         for f in findings:
                             abs_line = (current_line_offset + f['line'] - 1) if f['line'] > 0 else current_line_offset
-                            self.detected_codes.add(f"{f['code']}:{abs_line}")
+                            self._found.add((f['code'], abs_line))
 
                         # API & Selector Fixes
-                        if api in self.shield.DEPRECATIONS:
-                            if apply_fixes:
-                                mapping = self.shield.DEPRECATIONS[api]
-                                new_api = mapping.get(kind, mapping.get("default")) if isinstance(mapping, dict) else mapping
-                                if new_api and not str(new_api).startswith("REMOVED"):
-                                    parsed['apiVersion'] = new_api
-                                    if new_api == 'apps/v1' and kind == 'Deployment' and 'selector' not in parsed.get('spec', {}):
-                                        labels = parsed.get('spec', {}).get('template', {}).get('metadata', {}).get('labels')
-                                        if labels: 
-                                            parsed['spec']['selector'] = {'matchLabels': labels}
-                                            self.detected_codes.add(f"FIX_SELECTOR_INJECTED:{current_line_offset}")
+                        upgrade = upgrades.get(api)
+                        if upgrade:
+                            new_api = upgrade.get(kind) or upgrade["default"]
+                            if new_api and not str(new_api).startswith("REMOVED"):
+                                parsed['apiVersion'] = new_api
+                                api_rewrite = new_api
+                                if new_api == 'apps/v1' and kind == 'Deployment' and 'selector' not in parsed.get('spec', {}):
+                                    labels = parsed.get('spec', {}).get('template', {}).get('metadata', {}).get('labels')
+                                    if labels: 
+                                        parsed['spec']['selector'] = {'matchLabels': labels}
+                                        self._dirty = True
+                                        self._found.add(("FIX_SELECTOR_INJECTED", current_line_offset))
 
                         # Service Healing
                         if kind == 'Service' and apply_fixes and not parsed.get('spec', {}).get('selector'):
@@ -300,36 +606,58 @@ class Healer:
                                     break
                             if matching_labels:
                                 parsed['spec']['selector'] = matching_labels
-                                self.detected_codes.add(f"SVC_SELECTOR_FIXED:{current_line_offset}")
+                                self._dirty = True
+                                self._found.add(("SVC_SELECTOR_FIXED", current_line_offset))
 
                         self.apply_security_patches(parsed, kind, current_line_offset, apply_defaults)
-                        
-                        buf = StringIO()
-                        self.yaml.dump(parsed, buf)
-                        healed_parts.append(buf.getvalue().rstrip())
+
+                        # An apiVersion-only fix is rewritten in the text itself: no
+                        # dump, and the user's formatting is left untouched
+                        at = _value_offset(d, parsed, 'apiVersion', api) if api_rewrite and not self._dirty and not codes_only else -1
+                        if codes_only:
+                            pass
+                        elif at >= 0:
+                            part = f"{d[:at]}{api_rewrite}{d[at + len(api):]}".strip()
+                        else:
+                            buf.seek(0); buf.truncate()
+                            self.yaml.dump(parsed, buf)
+                            part = buf.getvalue().rstrip()
+                        self._dirty = self._dirty or bool(api_rewrite)
                     else:
-                        healed_parts.append(d.strip())
+                        part = d.strip()
 
-                except Exception as e:
-                    mark = getattr(e, 'problem_mark', None)                    
+                except _DOC_ERRORS as e:
+                    mark = getattr(e, 'problem_mark', None)
                     error_line = current_line_offset + (mark.line if mark else 0)
-                    self.detected_codes.add(f"SYNTAX_ERROR:{error_line}")
-                    healed_parts.append(d.strip())             
+                    self._found.add(("SYNTAX_ERROR", error_line))
+                    # Edits to a doc we fall back on never reach the output
+                    self._dirty = False
+                    part = d.strip()
+
+                if part is not None: first = self._emit_part(out, part, first)
+                doc_found, doc_dirty = self._found, self._dirty
+                found |= doc_found
+                self._dirty = dirty_before or doc_dirty
+                # Service/HPA/Ingress outcomes depend on the rest of the file
+                if kind is None or (isinstance(kind, str) and kind not in _CROSS_REF_KINDS):
+                    if len(memo) >= _DOC_MEMO_SIZE: del memo[next(iter(memo))]
+                    memo[memo_key] = (part, frozenset((code, line - current_line_offset) for code, line in doc_found), doc_dirty)
+            self._found = found
+
+            self.detected_codes = {f"{code}:{line}" for code, line in self._found}
+            if codes_only: return (None, self.detected_codes)
+
+            # --- 4. GHOST DOCUMENT FILTERING & STABILITY (done in _emit_part) ---
+            out.write("\n")
+            healed_final = out.getvalue()
 
-                current_line_offset += lines_in_doc + 1
-
-            # --- 4. GHOST DOCUMENT FILTERING & STABILITY ---
-            healed_parts = [p for p in healed_parts if p.strip()]
-            healed_final = ("---\n" if original_content.startswith("---") else "") + "\n---\n".join(healed_parts) + "\n"
-            
-            # Clean trailing whitespace on every line to ensure stability
-            healed_final = "\n".join([l.rstrip() for l in healed_final.splitlines()]) + "\n"
-            
             if return_content: return (healed_final, self.detected_codes)
             
-            changed = original_content.strip() != healed_final.strip()
-            if changed and not dry_run:
-                with open(file_path, 'w') as f: f.write(healed_final)
+            # Only text-level repairs need the full-file comparison
+            changed = self._dirty or original_content.strip() != healed_final.strip()
+            # A fix can round-trip to the very same text: leave the file (and its mtime) alone
+            if changed and not dry_run and healed_final != original_content:
+                write_atomic(file_path, healed_final)
             # NEW: If we are in dry_run, but the file is ALREADY clean, 
             # don't report the "FIX_" codes because they aren't actually needed!
             if dry_run and not changed:
@@ -338,11 +666,22 @@ class Healer:
                 
             return (changed, self.detected_codes)
 
-        except Exception:
+        except Exception as e:
+            # Tagged with the path so interleaved batch-worker logs stay attributable
+            logger.debug(f"Healing aborted for {file_path}: {e!r}")
             return (None if return_content else False, set())
 
-def linter_engine(file_path: str, apply_api_fixes: bool = True, apply_defaults: bool = False, dry_run: bool = False, return_content: bool = False) -> Tuple[Union[bool, Optional[str]], Set[str]]:
-    return Healer().heal_file(file_path, apply_api_fixes, apply_defaults, dry_run, return_content)
+# heal_file keeps per-run state (and its own loaders) on the instance, so reuse is per thread
+_ENGINE_TLS = threading.local()
+
+def _thread_healer() -> Healer:
+    healer = getattr(_ENGINE_TLS, 'healer', None)
+    if healer is None:
+        healer = _ENGINE_TLS.healer = Healer()
+    return healer
+
+def linter_engine(file_path: str, apply_api_fixes: bool = True, apply_defaults: bool = False, dry_run: bool = False, return_content: bool = False, codes_only: bool = False) -> Tuple[Union[bool, Optional[str]], Set[str]]:
+    return _thread_healer().heal_file(file_path, apply_api_fixes, apply_defaults, dry_run, return_content, codes_only)
 
 if __name__ == "__main__":
     if len(sys.argv) < 2: 
@@ -27,17 +27,46 @@ SOLVED EDGE CASES (15):
 import re
 
 class RawLexer:
+    # FIX: Updated Group 1 (\s*-?\s*) to actually capture the dash if it exists
+    # Compiled once for the class: every lexer and every line share it
+    kv_pattern = re.compile(r'^(\s*-?\s*)([^#:"\']+)\s*:\s*(.*)$')
+
     def __init__(self):
-        # FIX: Updated Group 1 (\s*-?\s*) to actually capture the dash if it exists
-        self.kv_pattern = re.compile(r'^(\s*-?\s*)([^#:"\']+)\s*:\s*(.*)$')
         self.in_block = False
         self.block_indent = 0
         self.skip_next = False
 
     def is_likely_new_key(self, line: str) -> bool:
-        return bool(self.kv_pattern.match(line))
+        return self.match_kv(line) is not None
+
+    def match_kv(self, line: str):
+        """
+        kv_pattern.match(line).groups() in one linear scan. The pattern's
+        overlapping whitespace runs backtrack cubically on a long indent that
+        never reaches a usable colon (500 spaces took ~20s).
+        """
+        if '\n' in line:
+            # '.' and '$' treat newlines specially: leave such input to the pattern
+            match = self.kv_pattern.match(line)
+            return match.groups() if match else None
+        colon = line.find(':')
+        head = line[:colon]
+        if colon <= 0 or '#' in head or '"' in head or "'" in head: return None
+        body = head.lstrip()
+        dash = body.startswith('-')
+        key = body[1:].lstrip() if dash else body
+        # The key is never empty: the pattern backs off to a lone dash or the last space
+        split = colon - len(key) if key else colon - 1
+        return head[:split], head[split:], line[colon + 1:].lstrip()
 
     def _find_comment_split(self, text: str) -> int:
+        # Most values carry no comment at all
+        if '#' not in text: return -1
+        # Without quotes or escapes there is no state to track: first '#' after a space
+        if '"' not in text and "'" not in text and '\\' not in text:
+            i = text.find('#')
+            while i > 0 and not text[i-1].isspace(): i = text.find('#', i + 1)
+            return i
         in_double_quote = False
         in_single_quote = False
         escaped = False
@@ -78,9 +107,9 @@ class RawLexer:
         if current_content.startswith('#'):
             return line.rstrip()
 
-        match = self.kv_pattern.match(line)
+        match = self.match_kv(line)
         if match:
-            prefix, key, remainder = match.groups()
+            prefix, key, remainder = match
             
             # --- INTELLIGENT SPACING (The fix we discussed) ---
             if prefix.endswith('-'):
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+--------------------------------------------------------------------------------
+AUTHOR:      Nishar A Sunkesala / FixMyK8s
+PURPOSE:      Shared YAML Loaders: libyaml-backed detection reads for Healer & Synapse.
+--------------------------------------------------------------------------------
+"""
+import re
+from typing import Optional
+from ruamel.yaml import YAML
+
+try:
+    from ruamel.yaml.main import CParser
+    from ruamel.yaml.constructor import RoundTripConstructor
+
+    class _MarkedConstructor(RoundTripConstructor):
+        comment_handling = None  # the C parser emits no comment tokens
+except ImportError:
+    CParser = None
+
+# Characters on which libyaml and ruamel's pure scanner can disagree
+_PURE_ONLY_RE = re.compile(r'[\t&*!%@`?]')
+
+
+def marked_yaml(allow_duplicate_keys: bool = False) -> Optional[YAML]:
+    """
+    Detection-only twin of the round-trip loader: the round-trip constructor
+    (CommentedMap nodes, lc line marks) fed by libyaml's C parser. Comments are
+    not kept, so it must never back a dump; only text passing in_marked_subset
+    is safe to give it. None when ruamel.yaml.clib is unavailable.
+    """
+    if CParser is None: return None
+    try:
+        marked = YAML(typ='rt')
+        marked.Reader = marked.Scanner = None
+        marked.Parser, marked.Constructor = CParser, _MarkedConstructor
+        marked.preserve_quotes = True
+        marked.allow_duplicate_keys = allow_duplicate_keys
+        if marked.load("a:\n  b: 1")['a'].lc.line != 1: return None
+        return marked
+    except Exception:
+        return None
+
+
+def in_marked_subset(text: str) -> bool:
+    """True when a marked_yaml() loader reads `text` exactly as the pure round-trip one."""
+    return text.isascii() and not _PURE_ONLY_RE.search(text)
@@ -7,36 +7,34 @@ CNCF-Grade CLI
 """
 # Core Engine 
 from kubecuro.healer import linter_engine
+from kubecuro.batch import iter_k8s_yamls
+from kubecuro.cache import LintCache, user_cache_file
 from kubecuro.synapse import Synapse
 from kubecuro.shield import Shield
 from kubecuro.models import AuditIssue
 
-import sys, os, logging, argparse, platform, time, json, re, difflib, argcomplete, random, contextlib, subprocess, yaml
+# Only what every command needs is imported up front; difflib/platform load where used
+import sys, os, logging, argparse, time, json, argcomplete, contextlib, multiprocessing
 import ruamel.yaml
 import rich.box as box
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
-from contextlib import contextmanager
-from io import StringIO
+from functools import partial, lru_cache
+from concurrent.futures import ProcessPoolExecutor
 
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
-from rich.live import Live
 from rich.logging import RichHandler
-from rich.markdown import Markdown
-from rich.syntax import Syntax
 from rich.rule import Rule
-from rich.layout import Layout
 from rich.text import Text
 from rich.align import Align
 from rich.columns import Columns
 from rich.console import Group
 from rich.theme import Theme
 from rich.traceback import install
-from rich.progress import (Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn, 
-                          TaskProgressColumn, ProgressBar, TimeElapsedColumn)
+from rich.progress_bar import ProgressBar
 
 from rich.padding import Padding
 from argcomplete.completers import FilesCompleter
@@ -236,7 +234,9 @@ class KubecuroCLI:
         if not target:
             self._error_exit("🎯 Target path (file/directory) required")
         
-        engine = AuditEngineV2(target, args.dry_run, args.yes, args.all, self.baseline_fingerprints, apply_defaults=args.apply_defaults)
+        # Unchanged files replay their syntax check and healer codes from the per-user cache
+        cache = None if getattr(args, 'no_cache', False) else LintCache(user_cache_file())
+        engine = AuditEngineV2(target, args.dry_run, args.yes, args.all, self.baseline_fingerprints, apply_defaults=args.apply_defaults, cache=cache)
         engine.execute(args.command)
     
     def _show_banner(self):
@@ -290,6 +290,7 @@ class KubecuroCLI:
     
     def _show_version(self, args):
         """Show version information."""
+        import platform
         self.console.print(f"[bold magenta]KubeCuro {CONFIG.VERSION}[/] • [dim]{platform.machine()}[/]")
     
     def _handle_completion(self, args):
@@ -402,6 +403,7 @@ class KubecuroCLI:
         # 5. FUZZY FALLBACK (Search across both Categories and Rule IDs)
         all_possible_keys = list(all_rules.keys()) + list(categories.keys())
         substring_matches = [k for k in all_possible_keys if search_term in k]
+        import difflib
         fuzzy_matches = difflib.get_close_matches(search_term, all_possible_keys, n=3, cutoff=0.5)
         
         suggestions = sorted(list(set(substring_matches + fuzzy_matches)))
@@ -445,7 +447,8 @@ class KubecuroCLI:
             yes=False, 
             show_all=True,      # Capture everything
             baseline=set(),      # Start with empty to find all issues
-            apply_defaults=getattr(args, 'apply_defaults', False)
+            apply_defaults=getattr(args, 'apply_defaults', False),
+            cache=LintCache(user_cache_file())
         )
         self.console.print("[bold cyan]🛡️ Generating baseline...[/]")
         issues = engine.audit()
@@ -470,26 +473,62 @@ class KubecuroCLI:
 # ═══════════════════════════════════════════════════════════════
 # S-TIER AUDIT ENGINE (Production Zero-Downtime)
 # ═══════════════════════════════════════════════
+# Syntax-check loader (libyaml-backed when available). The audit checks one
+# file at a time per process, pool workers included, so one per process serves
+_SYNTAX_YAML = ruamel.yaml.YAML(typ='safe')
+_SYNTAX_YAML.allow_duplicate_keys = True
+
+def _run_healer(fpath: str, apply_defaults: bool, dry_run: bool, codes_only: bool = False) -> Optional[tuple]:
+    """Unified Healer Route: (content, codes), or None (logged) if healing raised."""
+    try:
+        # We pass dry_run so the healer knows whether to log 'FIXED' or 'ISSUE'
+        content, codes = linter_engine(
+            file_path=fpath,
+            apply_api_fixes=True,
+            apply_defaults=apply_defaults,
+            dry_run=dry_run,
+            return_content=True,
+            codes_only=codes_only
+        )
+        return content, list(codes)
+    except Exception as e:
+        logging.error(f"Failed to process {fpath}: {e}")
+        return None
+
+def _prescan_file(fpath: str, apply_defaults: bool, dry_run: bool) -> tuple:
+    """Audit steps with no cross-file state: syntax check, then healer codes."""
+    try:
+        # Load all docs to validate full file structure; each is dropped once built
+        for _ in _SYNTAX_YAML.load_all(Path(fpath).read_text()):
+            pass
+    except Exception as yaml_err:
+        line_num = getattr(getattr(yaml_err, 'problem_mark', None), 'line', 1) + 1
+        return (line_num, str(yaml_err).split(':', 1)[-1].strip()), []
+    # codes_only skips building the healed text; a failed run reports codes as
+    # None (not []), which keeps it out of the cache
+    healed = _run_healer(fpath, apply_defaults, dry_run, codes_only=True)
+    return None, healed[1] if healed else None
+
+# Only a handful of distinct severity labels exist, so each is classified once
+@lru_cache(maxsize=64)
+def _severity_color(severity: str) -> str:
+    sev_upper = severity.upper()
+    if "CRITICAL" in sev_upper:
+        return "bright_red"
+    if "HIGH" in sev_upper:
+        return "orange3"
+    if "MEDIUM" in sev_upper:
+        return "yellow"
+    return "green"
+
 class AuditEngineV2:
     """Production-grade analysis + healing engine."""
 
     def _silent_healer(self, fpath: str) -> tuple[Optional[str], list]:
         """Unified Healer Route: Relies on Healer's internal two-pass logic."""
-        try:
-            # We pass self.dry_run so the healer knows whether to log 'FIXED' or 'ISSUE'
-            content, codes = linter_engine(
-                file_path=fpath,
-                apply_api_fixes=True,
-                apply_defaults=self.apply_defaults,
-                dry_run=self.dry_run, 
-                return_content=True
-            )
-            return content, list(codes)
-        except Exception as e:
-            logging.error(f"Failed to process {fpath}: {e}")
-            return None, []
+        return _run_healer(fpath, self.apply_defaults, self.dry_run) or (None, [])
     
-    def __init__(self, target: Path, dry_run: bool, yes: bool, show_all: bool, baseline: set, apply_defaults: bool = False):
+    def __init__(self, target: Path, dry_run: bool, yes: bool, show_all: bool, baseline: set, apply_defaults: bool = False, cache: Optional[LintCache] = None):
         self.target = Path(target)
         self.dry_run = dry_run
         self.console = Console()
@@ -497,6 +536,7 @@ class AuditEngineV2:
         self.show_all = show_all
         self.baseline = baseline
         self.apply_defaults = apply_defaults
+        self.cache = cache
         try:
             from kubecuro.healer import linter_engine
             self.healer = linter_engine
@@ -546,6 +586,36 @@ class AuditEngineV2:
             else:
                 self._execute_zero_downtime_fixes()
 
+    def _prescan(self, paths: List[str]):
+        """Yields _prescan_file results in input order; unchanged files replay from the cache."""
+        # Only files that parsed are cached, so a hit skips both the syntax check and the healer
+        flags = f"audit{int(self.apply_defaults)}{int(self.dry_run)}"
+        hits = {}
+        for p in (paths if self.cache is not None else ()):
+            hit = self.cache.get(p, flags)
+            if hit is not None:
+                hits[p] = (None, sorted(hit[1]))
+        fresh = self._prescan_fresh([p for p in paths if p not in hits])
+        for p in paths:
+            if p in hits:
+                yield hits[p]
+                continue
+            res = next(fresh)
+            if self.cache is not None and res[0] is None and res[1] is not None:
+                self.cache.put(p, flags, False, set(res[1]))
+            yield res
+
+    def _prescan_fresh(self, paths: List[str]):
+        """Runs _prescan_file in input order, fanned out across processes when worthwhile."""
+        prescan = partial(_prescan_file, apply_defaults=self.apply_defaults, dry_run=self.dry_run)
+        workers = min(os.cpu_count() or 1, len(paths))
+        # A process pool only pays for itself with several CPUs and a real batch
+        if workers <= 1 or len(paths) < 8:
+            yield from map(prescan, paths)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(prescan, paths, chunksize=max(1, len(paths) // (workers * 4)))
+
     def audit(self) -> List[AuditIssue]:
         """
         S-Tier Pipeline: 
@@ -572,23 +642,21 @@ class AuditEngineV2:
         
         problematic_files = []
         devnull = open(os.devnull, 'w')
+        # Syntax check + healer codes are per-file, so they run ahead (in parallel
+        # when possible); Synapse/Shield below stay serial as they accumulate state
+        fnames = [str(fpath.resolve()) for fpath in files]
+        prescans = self._prescan(fnames)
 
-        for i, fpath in enumerate(files, 1):
-            abs_fpath = fpath.resolve()
-            fname_full = str(abs_fpath)
+        for i, (fpath, fname_full) in enumerate(zip(files, fnames), 1):
             fname_short = fpath.name
             current_file_has_issues = False
+            with contextlib.redirect_stderr(devnull):
+                syntax_error, codes = next(prescans)
             
             # --- PHASE 1: SYNTAX CHECK ---
-            try:
-                content = fpath.read_text()
-                yaml_parser = ruamel.yaml.YAML(typ='safe')
-                yaml_parser.allow_duplicate_keys = True
-                # Load all docs to validate full file structure
-                list(yaml_parser.load_all(content))
-            except Exception as yaml_err:
+            if syntax_error:
                 # Syntax error detected! 
-                line_num = getattr(getattr(yaml_err, 'problem_mark', None), 'line', 1) + 1
+                line_num, problem = syntax_error
                 ident = f"{fname_full}:SYNTAX_ERROR"
                 
                 if ident not in seen:
@@ -596,7 +664,7 @@ class AuditEngineV2:
                         code="SYNTAX_ERROR",
                         severity="CRITICAL",
                         file=fname_full,
-                        message=f"YAML syntax error: {str(yaml_err).split(':', 1)[-1].strip()}",
+                        message=f"YAML syntax error: {problem}",
                         line=line_num
                     ))
                     seen.add(ident)
@@ -609,9 +677,10 @@ class AuditEngineV2:
             # --- PHASE 2: LOGIC & HEALER ANALYSIS (Valid YAML Only) ---
             try:
                 with contextlib.redirect_stderr(devnull):
-                    # 1. Logic Scan (Shield)
+                    # 1. Logic Scan (Shield) over the docs Synapse just parsed
+                    first_new = len(syn.all_docs)
                     syn.scan_file(str(fpath))
-                    docs = [d for d in syn.all_docs if d.get('_origin_file') == str(fpath)]
+                    docs = [d for d in syn.all_docs[first_new:] if d.get('_origin_file') == str(fpath)]
                     
                     for doc in docs:
                         for finding in shield.scan(doc, syn.all_docs):
@@ -632,10 +701,8 @@ class AuditEngineV2:
                                 seen.add(ident)
                                 current_file_has_issues = True
 
-                    # 2. Healer Scan (Resource Limits/Defaults)
-                    # Note: We use the engine directly to avoid double-reading the file
-                    _, codes = self._silent_healer(fname_full)
-                    for code_entry in codes:
+                    # 2. Healer Scan (Resource Limits/Defaults), prefetched above
+                    for code_entry in codes or ():
                         parts = str(code_entry).split(":")
                         ccode = parts[0].upper()
                         
@@ -680,6 +747,8 @@ class AuditEngineV2:
                 console.print(f"[dim]Logic scan failed for {fname_short}: {e}[/dim]")
 
         devnull.close()
+        if self.cache is not None:
+            self.cache.save()
         
         # --- PHASE 4: GLOBAL SYNC ---
         # Catch any lingering Synapse-level cluster issues (e.g. orphan services)
@@ -706,7 +775,8 @@ class AuditEngineV2:
         """Smart YAML discovery."""
         if self.target.is_file() and self.target.suffix.lower() in {'.yaml', '.yml'}:
             return [self.target]
-        return list(self.target.rglob("*.yaml")) + list(self.target.rglob("*.yml"))
+        # No header sniffing: YAML without apiVersion/kind still gets its syntax audited
+        return [Path(p) for p in iter_k8s_yamls(self.target, sniff=False)]
     
     def _filter_baseline(self, issues: List[AuditIssue]) -> List[AuditIssue]:
         """Filter suppressed issues."""
@@ -728,10 +798,13 @@ class AuditEngineV2:
             console.print(Padding(Align.center(Panel("[bold green]🎉 PERFECT CLUSTER HEALTH[/]", border_style="green", expand=False)), (1, 0)))
             return
         
-        # Severity dashboard - FIXED COUNTING LOGIC
-        high_count = len([i for i in issues if 'HIGH' in i.severity or 'CRITICAL' in i.severity])
-        med_count = len([i for i in issues if 'MEDIUM' in i.severity])
-        low_count = len([i for i in issues if 'LOW' in i.severity or 'INFO' in i.severity])
+        # Severity dashboard - FIXED COUNTING LOGIC (one pass over the issues)
+        high_count = med_count = low_count = 0
+        for i in issues:
+            sev = i.severity
+            if 'HIGH' in sev or 'CRITICAL' in sev: high_count += 1
+            if 'MEDIUM' in sev: med_count += 1
+            if 'LOW' in sev or 'INFO' in sev: low_count += 1
         
         severity_table = Table.grid(expand=True)
         severity_table.add_row(
@@ -787,16 +860,7 @@ class AuditEngineV2:
         
         # 3. Populate Rows
         for issue in sorted(issues, key=lambda x: x.line or 0):
-            sev_upper = issue.severity.upper()
-            if "CRITICAL" in sev_upper:
-                color = "bright_red"
-            elif "HIGH" in sev_upper:
-                color = "orange3"
-            elif "MEDIUM" in sev_upper:
-                color = "yellow"
-            else:
-                color = "green"
-                
+            color = _severity_color(issue.severity)
             table.add_row(
                 f"[{color}]{issue.severity}[/{color}]",
                 str(issue.line or "-"),
@@ -812,7 +876,16 @@ class AuditEngineV2:
         """
         # 1. DATA PREP: CALCULATE METRICS
         total_files = len(self._find_yaml_files())
-        syntax_errors = [i for i in issues if i.code == "SYNTAX_ERROR"]
+        # One pass sorts issues into syntax errors and (for the rest) severity bands
+        syntax_errors, high, med, low = [], [], [], []
+        for i in issues:
+            if i.code == "SYNTAX_ERROR":
+                syntax_errors.append(i)
+                continue
+            sev = i.severity.upper()
+            if 'HIGH' in sev or 'CRITICAL' in sev: high.append(i)
+            if 'MEDIUM' in sev: med.append(i)
+            if 'LOW' in sev or 'INFO' in sev: low.append(i)
         
         # Calculate Syntax Integrity %
         if total_files > 0:
@@ -820,12 +893,7 @@ class AuditEngineV2:
         else:
             syntax_score = 100
 
-        # Logic Deductions (Excluding syntax errors to avoid double-counting)
-        logic_issues = [i for i in issues if i.code != "SYNTAX_ERROR"]
-        high = [i for i in logic_issues if 'HIGH' in i.severity.upper() or 'CRITICAL' in i.severity.upper()]
-        med = [i for i in logic_issues if 'MEDIUM' in i.severity.upper()]
-        low = [i for i in logic_issues if 'LOW' in i.severity.upper() or 'INFO' in i.severity.upper()]
-        
+        # Logic Deductions (syntax errors were kept out of the bands above to avoid double-counting)
         # Deduct 15 for High, 5 for Med, 2 for Low
         logic_deduction = (len(high) * 15) + (len(med) * 5) + (len(low) * 2)
         logic_score = max(0, 100 - logic_deduction)
@@ -1153,6 +1221,7 @@ def create_parser() -> argparse.ArgumentParser:
     target_scan = scan_p.add_argument("target", help="Path to scan (file or directory)")
     target_scan.completer = FilesCompleter() # ⚡ Enables Tab completion for paths
     scan_p.add_argument("--all", action="store_true", help="Show all issues, including baselined")
+    scan_p.add_argument("--no-cache", action="store_true", help="Re-check every file, ignoring the cache in ~/.cache/kubecuro")
     
 
     # --- FIX COMMAND ---
@@ -1162,6 +1231,7 @@ def create_parser() -> argparse.ArgumentParser:
     fix_p.add_argument("-y", "--yes", action="store_true", help="Skip confirmation prompts")
     fix_p.add_argument("--dry-run", action="store_true", help="Show changes without writing to disk")
     fix_p.add_argument("--apply-defaults", action="store_true", help="Inject missing resource limits/probes")
+    fix_p.add_argument("--no-cache", action="store_true", help="Re-check every file, ignoring the cache in ~/.cache/kubecuro")
 
     # --- BASELINE COMMAND ---
     base_p = subparsers.add_parser("baseline", help="🛡️\u00A0 Suppress current issues into a baseline file")
@@ -1214,4 +1284,6 @@ def run():
     main()
 
 if __name__ == "__main__":
+    # The audit's process pool re-runs this script in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
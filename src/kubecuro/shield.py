@@ -18,6 +18,10 @@ class Shield:
     MEDIUM   = "🟡 MEDIUM"    # Deprecations/Best practices
     LOW      = "🔵 INFO"      # Hardening/Audit suggestions
 
+    # Kinds carrying a pod template; the limits check has never covered bare Pods
+    WORKLOAD_KINDS = frozenset({'Deployment', 'Pod', 'StatefulSet', 'DaemonSet', 'CronJob', 'Job'})
+    LIMITED_KINDS = WORKLOAD_KINDS - {'Pod'}
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
@@ -55,20 +59,19 @@ class Shield:
         "flowcontrol.apiserver.k8s.io/v1beta2": "flowcontrol.apiserver.k8s.io/v1beta3",
         "apiregistration.k8s.io/v1beta1": "apiregistration.k8s.io/v1"
     }
+    # Same catalog with every entry as a kind map carrying a "default", so a
+    # lookup is always `m.get(kind, m["default"])`
+    UPGRADES = {api: (m if isinstance(m, dict) else {"default": m}) for api, m in DEPRECATIONS.items()}
 
     def get_line(self, doc, key=None):
         """Helper to extract line number from ruamel.yaml-parsed dict."""
+        # EAFP: parsed nodes always carry lc, so the common path pays no hasattr probes
         try:
-            if doc is None:
-                return 1
-            
-            if key and hasattr(doc, 'lc') and hasattr(doc.lc, 'data') and key in doc.lc.data:
-                return doc.lc.data[key][0] + 1
-            
-            if hasattr(doc, 'lc') and hasattr(doc.lc, 'line'):
-                return doc.lc.line + 1
-            
-            return 1
+            lc = doc.lc
+            if key:
+                try: return lc.data[key][0] + 1
+                except KeyError: pass  # fall back to the node's own line
+            return lc.line + 1
         except Exception:
             return 1
 
@@ -115,9 +118,7 @@ class Shield:
         """Detects missing resource limits to prevent OOMKills."""
         findings = []
         kind = doc.get('kind')
-        workloads = ['Deployment', 'StatefulSet', 'DaemonSet', 'Job', 'CronJob']
-        
-        if kind in workloads:
+        if kind in self.LIMITED_KINDS:
             spec = doc.get('spec', {}) or {}
             
             # Consistent Navigation Logic
@@ -210,9 +211,9 @@ class Shield:
         name = doc.get('metadata', {}).get('name', 'unknown')
         
         # 1. API Deprecation Check
-        if api in self.DEPRECATIONS:
-            mapping = self.DEPRECATIONS[api]
-            better = mapping.get(kind, mapping.get("default")) if isinstance(mapping, dict) else mapping
+        upgrade = self.UPGRADES.get(api)
+        if upgrade:
+            better = upgrade.get(kind) or upgrade["default"]
             findings.append(self.add_finding(
                 "API_DEPRECATED",
                 self.MEDIUM,
@@ -221,8 +222,7 @@ class Shield:
             ))
         
         # 2. Workload Security Checks (Pod, Deployment, etc.)
-        workloads = ['Deployment', 'Pod', 'StatefulSet', 'DaemonSet', 'CronJob', 'Job']
-        if kind in workloads:
+        if kind in self.WORKLOAD_KINDS:
             spec = doc.get('spec') or {}
             
             # Navigate to the actual Pod Spec (t_spec)
@@ -330,25 +330,49 @@ class Shield:
       
 class RegexShield:
     """Sanitizes raw text to prevent YAML Parser crashes from human 'dirty' typing."""
-    
+
+    # Compiled once; sanitize() runs for every document of every file
+    DOC_MARKER_RE = re.compile(r'^---\s*$', re.MULTILINE)
+    IMAGE_TRAILING_COLON_RE = re.compile(r'(image:\s*)"([^"]+)"\s*:')
+    IMAGE_COLON_RUN_RE = re.compile(r'image:\s*[:\s]{2,}')
+    IMAGE_COLON_STRIP_RE = re.compile(r'(image:\s*)[:\s]+')
+    DRIFTED_CMD_RE = re.compile(r'^\s+(command|args):')
+    LEADING_WS_RE = re.compile(r'^(\s*)')
+    # Whole-text form of DRIFTED_CMD_RE: the indent run only, never crossing a line
+    DRIFTED_INDENT_RE = re.compile(r'^[^\S\n]+(?=(?:command|args):)', re.MULTILINE)
+    # Line breaks str.splitlines() honours besides '\n'
+    ODD_BREAKS_RE = re.compile('[\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]')
+
+    @staticmethod
+    def _align_to_previous_line(m: re.Match) -> str:
+        """DRIFTED_INDENT_RE callback: the previous line's indent (the original's, as before)."""
+        text, start = m.string, m.start()
+        if start == 0: return m.group(0)
+        prev_line = text[text.rfind('\n', 0, start - 1) + 1:start - 1]
+        return RegexShield.LEADING_WS_RE.match(prev_line).group(1)
+
     @staticmethod
     def sanitize(text: str) -> tuple[str, list]:
         fixes = []
         original = text
 
         # 0. FIX: Detect and "Ghost" empty documents
-        if re.search(r'^---\s*$', text, re.MULTILINE) and not text.strip().replace('---', ''):
+        if '---' in text and RegexShield.DOC_MARKER_RE.search(text) and not text.strip().replace('---', ''):
             fixes.append("SYNTAX_EMPTY_DOCUMENT")
             return "", fixes  # Return empty string to signify this block should be dropped
         
         # 1. FIX: Multi-colon or Trailing colon on image lines
-        if re.search(r'(image:\s*)"([^"]+)"\s*:', text):
-            text = re.sub(r'(image:\s*)"([^"]+)"\s*:', r'\1"\2"', text)
-            fixes.append("SYNTAX_REPAIRED")
-        
-        if re.search(r'image:\s*[:\s]{2,}', text):
-            text = re.sub(r'(image:\s*)[:\s]+', r'\1', text)
-            fixes.append("SYNTAX_REPAIRED")
+        # Each repair below needs its literal anchor, so an `in` test skips the
+        # regex on documents that cannot match (the common, clean case)
+        if "image:" in text:
+            # subn reports the hit count, so no separate search pass is needed
+            text, hits = RegexShield.IMAGE_TRAILING_COLON_RE.subn(r'\1"\2"', text)
+            if hits:
+                fixes.append("SYNTAX_REPAIRED")
+
+            if RegexShield.IMAGE_COLON_RUN_RE.search(text):
+                text = RegexShield.IMAGE_COLON_STRIP_RE.sub(r'\1', text)
+                fixes.append("SYNTAX_REPAIRED")
 
         # 2. Fixing 'tag: latest' spaces inside quotes
         if ": latest" in text:
@@ -357,29 +381,40 @@ class RegexShield:
 
         # 3. ELASTIC Indentation Fixer:
         # Matches the indentation of the PREVIOUS line to maintain block integrity.
-        lines = text.splitlines()
-        fixed_lines = []
-        
-        for i in range(len(lines)):
-            current_line = lines[i]
-            
-            # Check if this line is a drifted 'command' or 'args'
-            if i > 0 and re.search(r'^\s+(command|args):', current_line):
-                # Get the indentation of the previous line (e.g., 'image:' or 'name:')
-                prev_line = lines[i-1]
-                prev_indent_match = re.match(r'^(\s*)', prev_line)
-                
-                if prev_indent_match:
-                    target_indent = prev_indent_match.group(1)
-                    # If current line starts with a list marker '-' handle that, 
-                    # otherwise just align the keys vertically.
-                    content = current_line.lstrip()
-                    fixed_lines.append(f"{target_indent}{content}")
-                    continue
-            
-            fixed_lines.append(current_line)
-        
-        text = "\n".join(fixed_lines)
+        if not RegexShield.ODD_BREAKS_RE.search(text):
+            # '\n'-only text: the line round trip below would just drop one trailing
+            # newline, and the realignment is a single substitution
+            if text.endswith('\n'): text = text[:-1]
+            if "command:" in text or "args:" in text:
+                text = RegexShield.DRIFTED_INDENT_RE.sub(RegexShield._align_to_previous_line, text)
+            lines = fixed_lines = None
+        elif "command:" not in text and "args:" not in text:
+            # Only 'command:'/'args:' lines can drift; without either the lines pass through
+            lines = fixed_lines = text.splitlines()
+        else:
+            lines = text.splitlines()
+            fixed_lines = []
+            for i in range(len(lines)):
+                current_line = lines[i]
+
+                # Check if this line is a drifted 'command' or 'args'
+                if i > 0 and RegexShield.DRIFTED_CMD_RE.search(current_line):
+                    # Get the indentation of the previous line (e.g., 'image:' or 'name:')
+                    prev_line = lines[i-1]
+                    prev_indent_match = RegexShield.LEADING_WS_RE.match(prev_line)
+
+                    if prev_indent_match:
+                        target_indent = prev_indent_match.group(1)
+                        # If current line starts with a list marker '-' handle that,
+                        # otherwise just align the keys vertically.
+                        content = current_line.lstrip()
+                        fixed_lines.append(f"{target_indent}{content}")
+                        continue
+
+                fixed_lines.append(current_line)
+
+        if fixed_lines is not None:
+            text = "\n".join(fixed_lines)
         if text.strip() != original.strip() and "SYNTAX_REPAIRED" not in fixes:
             fixes.append("SYNTAX_REPAIRED")
             
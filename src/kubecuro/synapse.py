@@ -8,6 +8,8 @@ PURPOSE:      The Synapse Engine: Maps cross-resource logic gaps.
 import os
 from typing import List
 from ruamel.yaml import YAML
+from ruamel.yaml.error import YAMLError
+from kubecuro.loaders import marked_yaml, in_marked_subset
 
 # Robust model import
 try:
@@ -24,6 +26,8 @@ class Synapse:
         self.yaml = YAML(typ='rt')
         self.yaml.preserve_quotes = True
         self.yaml.allow_duplicate_keys = True
+        # Same nodes and line marks through libyaml; nothing here is ever dumped
+        self.fast_yaml = marked_yaml(allow_duplicate_keys=True)
         
         # Resource Registry
         self.all_docs = []
@@ -37,17 +41,27 @@ class Synapse:
 
     def get_line(self, doc, key=None):
         """Extract line from ruamel.yaml object (Shield-compatible)."""
+        # EAFP, as Shield.get_line: parsed nodes always carry lc
         try:
             if not doc:
                 return 1
-            if key and hasattr(doc, 'lc') and hasattr(doc.lc, 'data') and key in doc.lc.data:
-                return doc.lc.data[key][0] + 1
-            if hasattr(doc, 'lc') and hasattr(doc.lc, 'line'):
-                return doc.lc.line + 1
-            return 1
+            lc = doc.lc
+            if key:
+                try: return lc.data[key][0] + 1
+                except KeyError: pass  # fall back to the node's own line
+            return lc.line + 1
         except Exception:
             return 1
 
+    def load_docs(self, content: str) -> list:
+        """All documents of `content`; the round-trip loader has the final word on anything libyaml rejects."""
+        if self.fast_yaml is not None and in_marked_subset(content):
+            try:
+                return list(self.fast_yaml.load_all(content))
+            except YAMLError:
+                pass
+        return list(self.yaml.load_all(content))
+
     def scan_file(self, file_path: str):
         """Deep-scans YAML, preserving document references."""
         try:
@@ -60,7 +74,7 @@ class Synapse:
                 if not content.strip():
                     return
                     
-                docs = list(self.yaml.load_all(content))
+                docs = self.load_docs(content)
             
             for doc in docs:
                 if not doc or not isinstance(doc, dict) or 'kind' not in doc:
@@ -86,3 +86,267 @@ def test_checklist_command():
     result = run_kubecuro("checklist")
     output = result.stdout.upper()
     assert "CHECKLIST" in output or "LOGIC" in output
+
+def test_api_only_fix_keeps_formatting(tmp_path):
+    """Scenario: an apiVersion-only fix rewrites that value and nothing else."""
+    from kubecuro.healer import linter_engine
+    manifest = (
+        "apiVersion: extensions/v1beta1   # legacy\n"
+        "kind: Ingress\n"
+        "metadata:\n"
+        "  name: web\n"
+        "spec:\n"
+        "  rules:\n"
+        "  - host: example.com\n"
+    )
+    temp_file = tmp_path / "api_only.yaml"
+    temp_file.write_text(manifest)
+
+    content, codes = linter_engine(str(temp_file), return_content=True)
+    assert content == manifest.replace("extensions/v1beta1", "networking.k8s.io/v1")
+    assert "API_DEPRECATED:1" in codes
+
+def test_lint_files_matches_single_file_engine():
+    """Scenario: batch (multi-process) linting agrees with per-file linting."""
+    from kubecuro.healer import linter_engine
+    from kubecuro.batch import lint_files
+    samples = sorted(os.path.join("tests/samples", f) for f in os.listdir("tests/samples") if f.endswith(".yaml"))
+
+    results = lint_files(samples, dry_run=True, workers=2)
+    assert [r[0] for r in results] == samples
+    for path, changed, codes in results:
+        assert (changed, codes) == linter_engine(path, dry_run=True)
+
+def test_lint_cache_skips_unchanged_clean_files(tmp_path):
+    """Scenario: a clean file is remembered until its mtime/size change."""
+    from kubecuro.cache import LintCache
+    from kubecuro.batch import lint_files
+    manifest = tmp_path / "cm.yaml"
+    manifest.write_text("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: cfg\ndata:\n  mode: prod\n")
+    cache_file = str(tmp_path / ".kubecuro-cache.json")
+
+    assert lint_files([str(manifest)], dry_run=True, cache=LintCache(cache_file)) == [(str(manifest), False, set())]
+    assert LintCache(cache_file).is_clean(str(manifest), "10")
+
+    manifest.write_text("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: cfg\ndata:\n  mode: staging\n")
+    assert not LintCache(cache_file).is_clean(str(manifest), "10")
+
+def test_lint_cache_drops_entries_from_another_parser(tmp_path, monkeypatch):
+    """Scenario: switching between libyaml and the pure-Python parser invalidates the cache."""
+    from kubecuro import loaders
+    from kubecuro.cache import LintCache
+    from kubecuro.batch import lint_files
+    manifest = tmp_path / "cm.yaml"
+    manifest.write_text("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: cfg\ndata:\n  mode: prod\n")
+    cache_file = str(tmp_path / ".kubecuro-cache.json")
+    lint_files([str(manifest)], dry_run=True, cache=LintCache(cache_file))
+    assert LintCache(cache_file).is_clean(str(manifest), "10")
+
+    monkeypatch.setattr(loaders, "CParser", None if loaders.CParser else object)
+    assert not LintCache(cache_file).is_clean(str(manifest), "10")
+
+def test_lint_cache_replays_dry_run_findings(tmp_path):
+    """Scenario: dry-run findings are served from the cache, never a fixing run."""
+    from kubecuro.cache import LintCache
+    from kubecuro.batch import lint_files
+    manifest = tmp_path / "ing.yaml"
+    manifest.write_text("apiVersion: extensions/v1beta1\nkind: Ingress\nmetadata:\n  name: web\nspec:\n  rules: []\n")
+    cache_file = str(tmp_path / ".kubecuro-cache.json")
+
+    first = lint_files([str(manifest)], dry_run=True, cache=LintCache(cache_file))
+    assert "API_DEPRECATED:1" in first[0][2]
+    assert LintCache(cache_file).get(str(manifest), "10") == first[0][1:]
+    assert lint_files([str(manifest)], dry_run=True, cache=LintCache(cache_file)) == first
+
+    lint_files([str(manifest)], cache=LintCache(cache_file))
+    assert "networking.k8s.io/v1" in manifest.read_text()
+
+def test_audit_replays_unchanged_files_from_cache(tmp_path):
+    """Scenario: a cached audit reports the same issues without re-running the healer."""
+    from pathlib import Path
+    from unittest.mock import patch
+    from kubecuro.cache import LintCache
+    from kubecuro.main import AuditEngineV2
+    shutil.copy("tests/samples/hpa_logic_error.yaml", tmp_path)
+    (tmp_path / "broken.yaml").write_text("kind: Pod\nmetadata: [\n")
+    cache_file = str(tmp_path / ".kubecuro-cache.json")
+
+    def audit():
+        engine = AuditEngineV2(Path(tmp_path), True, True, True, set(), cache=LintCache(cache_file))
+        return sorted((i.code, i.file, i.line) for i in engine.audit())
+
+    first = audit()
+    assert ("SYNTAX_ERROR", str(tmp_path / "broken.yaml"), 3) in first
+    assert len(LintCache(cache_file).entries) == 1  # syntax errors are never cached
+    with patch("kubecuro.main.linter_engine", side_effect=AssertionError("cache miss")):
+        assert audit() == first
+
+def test_scan_keeps_a_user_cache(tmp_path, monkeypatch):
+    """Scenario: 'scan' records each parsed file's healer codes under $XDG_CACHE_HOME/kubecuro unless --no-cache."""
+    from kubecuro.cache import LintCache, CACHE_FILE, user_cache_file
+    sample = os.path.abspath("tests/samples/hpa_logic_error.yaml")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    monkeypatch.delenv("PYTEST_CURRENT_TEST")  # run the real CLI, not its test-mode banner
+    assert user_cache_file() == str(tmp_path / "xdg" / "kubecuro" / "lint-cache.json")
+
+    run_kubecuro("scan", "--no-cache", sample)
+    assert not os.path.exists(user_cache_file())
+
+    assert "HPA_MISSING_REQ" in run_kubecuro("scan", sample).stdout
+    assert len(LintCache(user_cache_file()).entries) == 1
+    assert "HPA_MISSING_REQ" in run_kubecuro("scan", sample).stdout
+    assert not os.path.exists(CACHE_FILE)  # nothing is left in the workspace
+
+def test_linter_engine_many_streams_every_file():
+    """Scenario: the streaming batch API reports each file exactly once."""
+    from kubecuro.healer import linter_engine
+    from kubecuro.batch import linter_engine_many
+    samples = sorted(os.path.join("tests/samples", f) for f in os.listdir("tests/samples") if f.endswith(".yaml"))
+
+    results = {path: (changed, codes) for path, changed, codes in linter_engine_many(samples, dry_run=True, workers=2, chunksize=1)}
+    assert sorted(results) == samples
+    assert all(results[p] == linter_engine(p, dry_run=True) for p in samples)
+
+def test_linter_engine_is_thread_safe():
+    """Scenario: threaded callers get the same results as a serial run, whichever entry point they use."""
+    from concurrent.futures import ThreadPoolExecutor
+    from kubecuro.healer import Healer, linter_engine
+    from kubecuro.batch import lint_files
+    samples = sorted(os.path.join("tests/samples", f) for f in os.listdir("tests/samples") if f.endswith(".yaml")) * 10
+
+    serial = [linter_engine(p, dry_run=True, return_content=True) for p in samples]
+    entry_points = [
+        lambda p: linter_engine(p, dry_run=True, return_content=True),
+        lambda p: lint_files([p], dry_run=True, return_content=True, workers=1)[0][1:],
+        lambda p: Healer().heal_file(p, dry_run=True, return_content=True),
+    ]
+    for heal in entry_points:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert list(pool.map(heal, samples)) == serial
+
+def test_codes_only_matches_full_heal():
+    """Scenario: detection-only healing reports exactly the codes of a full heal."""
+    from kubecuro.healer import linter_engine
+    for name in sorted(os.listdir("tests/samples")):
+        path = os.path.join("tests/samples", name)
+        _, full_codes = linter_engine(path, dry_run=True, return_content=True)
+        content, codes = linter_engine(path, dry_run=True, codes_only=True)
+        assert content is None
+        assert codes == full_codes
+
+def test_codes_only_skips_parse_without_losing_codes(tmp_path):
+    """Scenario: unscanned kinds keep their schema and syntax verdicts in detection-only mode."""
+    from kubecuro.healer import linter_engine
+    manifest = tmp_path / "inert.yaml"
+    manifest.write_text(
+        "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: empty\n---\n"
+        "apiVersion: v1\nkind: Secret\nmetadata:\n  name: creds\nstringData:\n  user: admin\n---\n"
+        "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: dup\ndata:\n  mode: a\n  mode: b\n"
+    )
+
+    _, full_codes = linter_engine(str(manifest), dry_run=True, return_content=True)
+    _, codes = linter_engine(str(manifest), dry_run=True, codes_only=True)
+    assert codes == full_codes
+    assert "SCHEMA_INVALID_STRUCTURE:1" in codes
+    assert any(c.startswith("SYNTAX_ERROR:") for c in codes)
+
+def test_codes_only_blank_file_returns_no_content(tmp_path):
+    """Scenario: a blank file in detection-only mode answers like any other file."""
+    from kubecuro.healer import linter_engine
+    manifest = tmp_path / "blank.yaml"
+    manifest.write_text("\n  \n")
+    assert linter_engine(str(manifest), codes_only=True) == (None, set())
+
+def test_repeated_documents_heal_like_the_first(tmp_path):
+    """Scenario: a repeated document gets the same fixes and codes, shifted to its own lines."""
+    from kubecuro.healer import linter_engine
+    doc = (
+        "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: web\nspec:\n"
+        "  template:\n    spec:\n      containers:\n      - name: app\n        image: nginx\n"
+    )
+    manifest = tmp_path / "repeated.yaml"
+    manifest.write_text(doc + "---\n" + doc)
+
+    content, codes = linter_engine(str(manifest), apply_defaults=True, dry_run=True, return_content=True)
+    first = {c for c in codes if int(c.rsplit(":", 1)[1]) <= 11}
+    assert "OOM_FIXED:9" in first
+    assert codes == first | {f"{c.rsplit(':', 1)[0]}:{int(c.rsplit(':', 1)[1]) + 11}" for c in first}
+    assert content.count("limits:") == 2
+
+def test_multi_document_findings_keep_their_lines(tmp_path):
+    """Scenario: findings in later documents point at their own lines, never at a '---'."""
+    from kubecuro.healer import linter_engine
+    manifest = tmp_path / "bundle.yaml"
+    manifest.write_text(
+        "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: a\ndata:\n  k: v\n"
+        "---\n"
+        "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: b\n"  # no data: starts on line 8
+        "---\n\n"
+        "apiVersion: extensions/v1beta1\nkind: Deployment\nmetadata:\n  name: web\n"  # line 14
+        "spec:\n  template:\n    metadata:\n      labels:\n        app: web\n"
+        "    spec:\n      automountServiceAccountToken: false\n      containers:\n"
+        "      - name: web\n        image: nginx:1.25\n"  # container on line 26
+    )
+    expected = {"SCHEMA_INVALID_STRUCTURE:8", "API_DEPRECATED:14", "FIX_SELECTOR_INJECTED:14", "OOM_RISK:26"}
+
+    assert linter_engine(str(manifest), dry_run=True)[1] == expected
+    assert linter_engine(str(manifest), dry_run=True, codes_only=True)[1] == expected
+
+def test_non_finite_quantity_fails_only_its_document(tmp_path):
+    """Scenario: 'cpu: inf' breaks the limits patch for its own document, not the whole file."""
+    from kubecuro.healer import linter_engine
+    manifest = tmp_path / "inf.yaml"
+    manifest.write_text(
+        "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: cfg\n"
+        "---\n"
+        "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: web\nspec:\n  template:\n    spec:\n"
+        "      containers:\n      - name: web\n        image: nginx:1.25\n"
+        "        resources:\n          requests:\n            cpu: inf\n"
+    )
+    content, codes = linter_engine(str(manifest), apply_defaults=True, dry_run=True, return_content=True)
+
+    assert content == manifest.read_text()
+    assert {"SCHEMA_INVALID_STRUCTURE:1", "SYNTAX_ERROR:6"} <= codes
+
+def test_inert_header_reads_only_documents_no_rule_touches():
+    """Scenario: inert_header answers for plain documents and defers everything else to the full parse."""
+    from kubecuro.healer import Healer
+    healer = Healer()
+    if healer.marked_yaml is None:
+        pytest.skip("inert_header needs ruamel.yaml.clib")
+
+    assert healer.inert_header("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: cfg\ndata:\n  mode: prod\n") == \
+        ("ConfigMap", {"apiVersion", "kind", "metadata", "data"})
+    # Schema gaps are still the caller's to judge, and a missing kind is no reason to parse
+    assert healer.inert_header("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: cfg\n") == \
+        ("ConfigMap", {"apiVersion", "kind", "metadata"})
+    assert healer.inert_header("metadata:\n  name: cfg\n") == (None, {"metadata"})
+
+    needs_full_parse = {
+        "scanned kind": "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: web\nspec: {}\n",
+        "quoted scanned kind": "apiVersion: v1\nkind: \"Service\"\nmetadata:\n  name: web\n",
+        "deprecated api": "apiVersion: extensions/v1beta1\nkind: NetworkPolicy\nmetadata:\n  name: np\nspec: {}\n",
+        "duplicate key": "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: a\nmetadata:\n  name: b\n",
+        "non-str key": "apiVersion: v1\nkind: ConfigMap\ndata:\n  1: x\n",
+        "typed scalar": "apiVersion: v1\nkind: ConfigMap\ndata:\n  port: 8080\n",
+        "scalar metadata": "apiVersion: v1\nkind: ConfigMap\nmetadata: cfg\n",
+        "sequence root": "- a\n- b\n",
+        "tab": "apiVersion: v1\nkind: ConfigMap\nmetadata:\n\tname: a\n",
+        "syntax error": "apiVersion: v1\nkind: ConfigMap\nmetadata: [\n",
+        "two documents": "kind: ConfigMap\n---\nkind: Secret\n",
+    }
+    for case, text in needs_full_parse.items():
+        assert healer.inert_header(text) is None, case
+
+def test_iter_k8s_yamls_walks_and_sniffs(tmp_path):
+    """Scenario: discovery recurses, keeps YAML only, and sniffs out non-manifests."""
+    from kubecuro.batch import iter_k8s_yamls
+    (tmp_path / "charts" / "web").mkdir(parents=True)
+    (tmp_path / "deploy.yaml").write_text("apiVersion: apps/v1\nkind: Deployment\n")
+    (tmp_path / "charts" / "web" / "svc.yml").write_text("kind: Service\n")
+    (tmp_path / "charts" / "web" / "values.yaml").write_text("replicas: 3\n")
+    (tmp_path / "README.md").write_text("kind: notes\n")
+
+    assert sorted(iter_k8s_yamls(str(tmp_path))) == [str(tmp_path / "charts" / "web" / "svc.yml"), str(tmp_path / "deploy.yaml")]
+    assert len(list(iter_k8s_yamls(str(tmp_path), sniff=False))) == 3